@@ -57,7 +57,44 @@ enum TransmitState
 };
 TransmitState txState = IDLE;
 char gps_packet[64];
-char imu_packet[128];
+
+// ----------------- Batched IMU Frames -----------------
+// Binary frame carrying up to IMU_BATCH_SAMPLES samples spread evenly over
+// the send interval:
+//   [0]    IMU_BATCH_MAGIC
+//   [1]    number of samples in the frame
+//   [2..5] millis() of the first sample, little-endian
+//   [6..9] millis() when the frame was built, little-endian
+//   then per sample: varint ms since the previous sample, followed by
+//   IMU_BATCH_CHANNELS zigzag varints holding the change of each quantized
+//   channel since the previous sample (the first sample is relative to 0)
+// If the samples don't all fit, the oldest ones are dropped.
+#define IMU_BATCH_MAGIC 0xD1
+#define IMU_BATCH_SAMPLES 16
+#define IMU_BATCH_CHANNELS 11
+#define IMU_BATCH_HEADER_LEN 10
+#define IMU_BATCH_MAX_SAMPLE_LEN (5 * (IMU_BATCH_CHANNELS + 1)) // Worst case varints
+
+// Quantization factors: acc xyz, mag xyz, gyro xyz, pressure, temp
+const float imuBatchScale[IMU_BATCH_CHANNELS] = {
+    50.0f, 50.0f, 50.0f,    // 0.02 m/s^2
+    10.0f, 10.0f, 10.0f,    // 0.1 uT
+    200.0f, 200.0f, 200.0f, // 0.005 rad/s
+    100.0f,                 // 0.01 hPa
+    100.0f                  // 0.01 C
+};
+
+struct ImuSample
+{
+  uint32_t ms;
+  int32_t values[IMU_BATCH_CHANNELS];
+};
+ImuSample imuRing[IMU_BATCH_SAMPLES]; // Most recent samples, oldest overwritten
+uint8_t imuRingHead = 0;
+uint8_t imuRingCount = 0;
+uint32_t lastImuSample = 0;
+const uint32_t imuSampleInterval = sendInterval / IMU_BATCH_SAMPLES;
+uint8_t imu_frame[RH_RF95_MAX_MESSAGE_LEN];
 
 void setup()
 {
@@ -134,27 +171,110 @@ void setup()
   dataFile.println("timestamp,lat,lng,alt,ax,ay,az,mx,my,mz,gx,gy,gz,pressure,temp");
 }
 
-void get10DOFData(char *buffer, size_t bufferSize)
+// Quantize a sensor reading into the IMU ring buffer
+void pushImuSample(uint32_t ms, const sensors_event_t &accel, const sensors_event_t &mag,
+                   const sensors_event_t &gyro, const sensors_event_t &bmp,
+                   float temp)
 {
-  sensors_event_t accel_event, mag_event, gyro_event, bmp_event;
+  const float raw[IMU_BATCH_CHANNELS] = {
+      accel.acceleration.x, accel.acceleration.y, accel.acceleration.z,
+      mag.magnetic.x, mag.magnetic.y, mag.magnetic.z,
+      gyro.gyro.x, gyro.gyro.y, gyro.gyro.z,
+      bmp.pressure, temp};
+
+  ImuSample &sample = imuRing[imuRingHead];
+  sample.ms = ms;
+  for (uint8_t i = 0; i < IMU_BATCH_CHANNELS; i++)
+  {
+    sample.values[i] = lroundf(raw[i] * imuBatchScale[i]);
+  }
 
-  accel.getEvent(&accel_event);
-  mag.getEvent(&mag_event);
-  gyro.getEvent(&gyro_event);
-  bmp.getEvent(&bmp_event);
+  imuRingHead = (imuRingHead + 1) % IMU_BATCH_SAMPLES;
+  if (imuRingCount < IMU_BATCH_SAMPLES)
+  {
+    imuRingCount++;
+  }
+}
 
-  float temperature;
-  bmp.getTemperature(&temperature);
+size_t writeVarint(uint8_t *out, uint32_t value)
+{
+  size_t len = 0;
+  while (value >= 0x80)
+  {
+    out[len++] = (value & 0x7F) | 0x80;
+    value >>= 7;
+  }
+  out[len++] = value;
+  return len;
+}
+
+// Map signed values to unsigned so small negative deltas stay short
+uint32_t zigzag(int32_t value)
+{
+  return ((uint32_t)value << 1) ^ (uint32_t)(value >> 31);
+}
+
+void writeUint32(uint8_t *out, uint32_t value)
+{
+  out[0] = value & 0xFF;
+  out[1] = (value >> 8) & 0xFF;
+  out[2] = (value >> 16) & 0xFF;
+  out[3] = (value >> 24) & 0xFF;
+}
 
-  snprintf(buffer, bufferSize,
-           "ACC=%.2f,%.2f,%.2f"
-           ",MAG=%.2f,%.2f,%.2f"
-           ",GYRO=%.2f,%.2f,%.2f"
-           ",PRES=%.2f,TEMP=%.2f",
-           accel_event.acceleration.x, accel_event.acceleration.y, accel_event.acceleration.z,
-           mag_event.magnetic.x, mag_event.magnetic.y, mag_event.magnetic.z,
-           gyro_event.gyro.x, gyro_event.gyro.y, gyro_event.gyro.z,
-           bmp_event.pressure, temperature);
+// Encode the buffered samples, leaving out the oldest `skip` of them.
+// Returns the frame length, or 0 if the samples don't fit in frameSize.
+size_t encodeImuSamples(uint8_t *frame, size_t frameSize, uint8_t skip, uint32_t sendMs)
+{
+  uint8_t count = imuRingCount - skip;
+  uint8_t oldest = (imuRingHead + IMU_BATCH_SAMPLES - count) % IMU_BATCH_SAMPLES;
+  uint32_t startMs = imuRing[oldest].ms;
+  frame[0] = IMU_BATCH_MAGIC;
+  frame[1] = count;
+  writeUint32(frame + 2, startMs);
+  writeUint32(frame + 6, sendMs);
+
+  size_t len = IMU_BATCH_HEADER_LEN;
+  uint32_t prevMs = startMs;
+  int32_t prev[IMU_BATCH_CHANNELS] = {0};
+  uint8_t encoded[IMU_BATCH_MAX_SAMPLE_LEN];
+
+  for (uint8_t n = 0; n < count; n++)
+  {
+    // Encode into scratch space first so the frame is never overrun
+    const ImuSample &sample = imuRing[(oldest + n) % IMU_BATCH_SAMPLES];
+    size_t sampleLen = writeVarint(encoded, sample.ms - prevMs);
+    for (uint8_t i = 0; i < IMU_BATCH_CHANNELS; i++)
+    {
+      sampleLen += writeVarint(encoded + sampleLen, zigzag(sample.values[i] - prev[i]));
+    }
+    if (len + sampleLen > frameSize)
+    {
+      return 0;
+    }
+
+    memcpy(frame + len, encoded, sampleLen);
+    len += sampleLen;
+    memcpy(prev, sample.values, sizeof(prev));
+    prevMs = sample.ms;
+  }
+
+  return len;
+}
+
+// Encode the buffered samples into a batched IMU frame and empty the ring.
+// The newest sample is always kept; the oldest are dropped until the rest
+// fit. Returns the frame length, or 0 if there was nothing to send.
+size_t encodeImuBatch(uint8_t *frame, size_t frameSize, uint32_t sendMs)
+{
+  size_t len = 0;
+  for (uint8_t skip = 0; skip < imuRingCount && len == 0; skip++)
+  {
+    len = encodeImuSamples(frame, frameSize, skip, sendMs);
+  }
+
+  imuRingCount = 0;
+  return len;
 }
 
 // Add this function for efficient SD writing
@@ -210,6 +330,14 @@ void loop()
   // Log data to SD (runs at full speed)
   logData(accel_event, mag_event, gyro_event, bmp_event, temperature);
 
+  // Buffer samples spread evenly over the send interval for the next
+  // batched IMU frame
+  if (now - lastImuSample >= imuSampleInterval)
+  {
+    pushImuSample(now, accel_event, mag_event, gyro_event, bmp_event, temperature);
+    lastImuSample = now;
+  }
+
   // Non-blocking LoRa state machine
   if (now - lastLoRaSend >= sendInterval)
   {
@@ -238,10 +366,17 @@ void loop()
     }
     else if (txState == SENDING_GPS && rf95.waitPacketSent(0))
     { // Non-blocking check
-      // GPS packet sent, start IMU packet
-      get10DOFData(imu_packet, sizeof(imu_packet));
-      rf95.send((uint8_t *)imu_packet, strlen(imu_packet));
-      txState = SENDING_IMU;
+      // GPS packet sent, start batched IMU frame
+      size_t len = encodeImuBatch(imu_frame, sizeof(imu_frame), millis());
+      if (len > 0)
+      {
+        rf95.send(imu_frame, len);
+        txState = SENDING_IMU;
+      }
+      else
+      {
+        txState = IDLE;
+      }
     }
     else if (txState == SENDING_IMU && rf95.waitPacketSent(0))
     { // Non-blocking check
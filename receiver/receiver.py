@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for
+from flask import Flask, render_template, jsonify, request, redirect, url_for, Response, stream_with_context
 import threading
 import time
 import json
@@ -9,8 +9,11 @@ import adafruit_rfm9x
 import adafruit_gps
 import serial
 from threading import Lock
+from collections import deque
 import os
 import math
+import mmap
+import struct
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -25,12 +28,44 @@ DEFAULT_SETTINGS = {
     'gps_baudrate': 9600
 }
 
+# Warm-restart checkpoint file path
+CHECKPOINT_FILE = 'state.bin'
+
+# Number of recent samples kept in memory and in the checkpoint
+HISTORY_LENGTH = 4096
+
+# Append-only log of every sample in the current flight, used for exports
+FLIGHT_LOG_FILE = 'flight.csv'
+
+# Directory holding the logs of earlier flights
+FLIGHT_ARCHIVE_DIR = 'flights'
+
+# Approximate size of each chunk sent by the export routes
+EXPORT_CHUNK_SIZE = 8192
+
+# Batched IMU frame marker and quantization factors, must match the firmware
+# Channels: acc xyz, mag xyz, gyro xyz, pressure, temp
+IMU_BATCH_MAGIC = 0xD1
+IMU_BATCH_SCALES = (50.0, 50.0, 50.0, 10.0, 10.0, 10.0, 200.0, 200.0, 200.0, 100.0, 100.0)
+
+# How long each LoRa receive call holds lora_lock, in seconds
+LORA_RECEIVE_TIMEOUT = 0.2
+
+# Valid ranges for user-editable settings
+FREQUENCY_RANGE = (400.0, 500.0)
+TX_POWER_RANGE = (5, 23)
+GPS_BAUDRATES = (4800, 9600, 19200, 38400, 57600, 115200)
+
 # Global variables
 gps = None
+gps_uart = None
 rfm9x = None
+current_settings = None
 data_lock = Lock()
 settings_lock = Lock()
+settings_update_lock = Lock()
 lora_lock = Lock()
+gps_lock = Lock()
 
 # Global variables to store latest data
 latest_data = {
@@ -44,9 +79,41 @@ latest_data = {
     },
     'receiver_gps': {'lat': 0, 'lng': 0, 'alt': 0},
     'distance': 0,
-    'timestamp': 0
+    'timestamp': 0,
+    'link': {
+        'packets': 0,
+        'gps_packets': 0,
+        'imu_packets': 0,
+        'parse_errors': 0,
+        'rssi': 0
+    }
 }
 
+# Recent rocket samples, one tuple per received packet, ordered as SAMPLE_FIELDS
+SAMPLE_FIELDS = ('timestamp', 'lat', 'lng', 'alt',
+                 'ax', 'ay', 'az', 'mx', 'my', 'mz', 'gx', 'gy', 'gz',
+                 'pressure', 'temp')
+sample_history = deque(maxlen=HISTORY_LENGTH)
+
+# Checkpoint file layout (all little-endian, fixed offsets):
+#   header:  magic, version, history length, next history slot, history count
+#   state:   latest_data values as doubles, then link counters and RSSI
+#   history: HISTORY_LENGTH sample records of len(SAMPLE_FIELDS) doubles
+CHECKPOINT_MAGIC = b'RTCK'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct('<4sIIII')
+CHECKPOINT_STATE = struct.Struct('<19d4Qd')
+CHECKPOINT_SAMPLE = struct.Struct(f'<{len(SAMPLE_FIELDS)}d')
+CHECKPOINT_STATE_OFFSET = CHECKPOINT_HEADER.size
+CHECKPOINT_HISTORY_OFFSET = CHECKPOINT_STATE_OFFSET + CHECKPOINT_STATE.size
+CHECKPOINT_SIZE = CHECKPOINT_HISTORY_OFFSET + HISTORY_LENGTH * CHECKPOINT_SAMPLE.size
+
+checkpoint_mm = None
+checkpoint_head = 0
+checkpoint_count = 0
+
+flight_log = None
+
 def calculate_distance(lat1, lon1, lat2, lon2):
     """Calculate distance between two points in meters using Haversine formula"""
     R = 6371000  # Earth's radius in meters
@@ -67,35 +134,46 @@ def calculate_distance(lat1, lon1, lat2, lon2):
 
 def initialize_gps(baudrate):
     """Initialize GPS module"""
+    global gps_uart
+
     uart = serial.Serial("/dev/ttyS0", baudrate=baudrate, timeout=10)
-    gps_module = adafruit_gps.GPS(uart, debug=False)
-    
-    # Initialize the GPS module
-    gps_module.send_command(b'PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0')
-    gps_module.send_command(b'PMTK220,1000')
-    
+    try:
+        gps_module = adafruit_gps.GPS(uart, debug=False)
+
+        # Initialize the GPS module
+        gps_module.send_command(b'PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0')
+        gps_module.send_command(b'PMTK220,1000')
+    except Exception:
+        uart.close()
+        raise
+
+    # Only publish the port once the module is fully set up
+    gps_uart = uart
     return gps_module
 
 def gps_receiver():
     """Background thread to receive GPS data"""
-    global gps
-    
     while True:
         try:
-            if gps is None:
+            # Take a local reference so a baud rate change can swap the
+            # module out from under us between iterations
+            with gps_lock:
+                gps_module = gps
+
+            if gps_module is None:
                 time.sleep(1)
                 continue
 
-            gps.update()
-            if not gps.has_fix:
+            gps_module.update()
+            if not gps_module.has_fix:
                 time.sleep(0.1)
                 continue
 
             with data_lock:
                 latest_data['receiver_gps'].update({
-                    'lat': gps.latitude,
-                    'lng': gps.longitude,
-                    'alt': gps.altitude_m if gps.altitude_m is not None else 0
+                    'lat': gps_module.latitude,
+                    'lng': gps_module.longitude,
+                    'alt': gps_module.altitude_m if gps_module.altitude_m is not None else 0
                 })
                 
                 # Calculate distance if we have both positions
@@ -107,6 +185,8 @@ def gps_receiver():
                         latest_data['receiver_gps']['lng']
                     )
 
+                checkpoint_state()
+
         except Exception as e:
             print(f"Error reading GPS: {e}")
             time.sleep(1)
@@ -127,43 +207,166 @@ def load_settings():
     return DEFAULT_SETTINGS.copy()
 
 def save_settings(settings):
-    """Save settings to file"""
-    with open(SETTINGS_FILE, 'w') as f:
+    """Save settings to file atomically
+
+    The settings are written to a temporary file next to SETTINGS_FILE and
+    renamed over it, so a crash or power loss mid-write never leaves a
+    truncated settings file behind.
+    """
+    tmp_file = SETTINGS_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
         json.dump(settings, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, SETTINGS_FILE)
 
-def initialize_lora(frequency, tx_power):
-    """Initialize or reinitialize LoRa radio with given settings"""
-    global rfm9x
-    
-    # Set up thread safety
+def get_settings():
+    """Return a copy of the in-memory settings, loading them on first use"""
+    global current_settings
+
+    with settings_lock:
+        if current_settings is None:
+            current_settings = load_settings()
+        return dict(current_settings)
+
+def validate_settings(settings):
+    """Raise ValueError if any setting is outside its supported range"""
+    if not FREQUENCY_RANGE[0] <= settings['frequency'] <= FREQUENCY_RANGE[1]:
+        raise ValueError(f"Frequency must be between {FREQUENCY_RANGE[0]} and {FREQUENCY_RANGE[1]} MHz")
+    if not TX_POWER_RANGE[0] <= settings['tx_power'] <= TX_POWER_RANGE[1]:
+        raise ValueError(f"TX power must be between {TX_POWER_RANGE[0]} and {TX_POWER_RANGE[1]} dB")
+    if settings['gps_baudrate'] not in GPS_BAUDRATES:
+        raise ValueError(f"Unsupported GPS baudrate: {settings['gps_baudrate']}")
+
+def update_settings(new_settings):
+    """Validate, apply and persist new settings
+
+    Only the settings that actually changed are pushed to the hardware, and
+    only the ones the hardware accepted are kept in memory and saved, so
+    the stored settings always match what is running. Returns the settings
+    now in effect, or raises RuntimeError if any change could not be applied.
+    """
+    global current_settings
+
+    validate_settings(new_settings)
+
+    # Serialize updates, but apply them to the hardware without holding
+    # settings_lock so get_settings() never waits on the radio
+    with settings_update_lock:
+        old_settings = get_settings()
+        settings = dict(old_settings)
+        settings.update(new_settings)
+
+        applied, errors = on_settings_changed(old_settings, settings)
+        if applied != old_settings:
+            with settings_lock:
+                current_settings = applied
+                save_settings(applied)
+
+        if errors:
+            raise RuntimeError('; '.join(errors))
+        return dict(applied)
+
+def on_settings_changed(old_settings, new_settings):
+    """Apply changed settings to the running hardware
+
+    Each change is applied independently so one failure does not block the
+    others. Returns the settings now in effect and a list of error messages.
+    """
+    applied = dict(old_settings)
+    errors = []
+
+    if new_settings['frequency'] != old_settings['frequency']:
+        try:
+            retune_lora(frequency=new_settings['frequency'])
+            applied['frequency'] = new_settings['frequency']
+        except Exception as e:
+            errors.append(f"LoRa frequency change failed: {e}")
+
+    if new_settings['tx_power'] != old_settings['tx_power']:
+        try:
+            retune_lora(tx_power=new_settings['tx_power'])
+            applied['tx_power'] = new_settings['tx_power']
+        except Exception as e:
+            errors.append(f"LoRa TX power change failed: {e}")
+
+    if new_settings['gps_baudrate'] != old_settings['gps_baudrate']:
+        try:
+            reopen_gps(new_settings['gps_baudrate'])
+            applied['gps_baudrate'] = new_settings['gps_baudrate']
+        except Exception as e:
+            errors.append(f"GPS reopen failed: {e}")
+
+    return applied, errors
+
+def retune_lora(frequency=None, tx_power=None):
+    """Change frequency and/or TX power on the existing LoRa radio
+
+    Unlike initialize_lora() this keeps the current SPI bus, pins and RFM9x
+    instance, so the receiver thread only pauses for the few register writes.
+    """
     with lora_lock:
-        # Configure RFM95 / LoRa radio
-        CS = digitalio.DigitalInOut(board.CE1)
-        RESET = digitalio.DigitalInOut(board.D25)
-        
-        # Explicitly set the pins as outputs
-        CS.direction = digitalio.Direction.OUTPUT
-        RESET.direction = digitalio.Direction.OUTPUT
-        
-        spi = busio.SPI(board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+        if rfm9x is None:
+            raise RuntimeError('LoRa radio is not initialized')
 
-        # Clean up old instance if it exists
-        if rfm9x is not None:
-            # Clean up old instance if it exists
+        rfm9x.idle()
+        try:
+            if frequency is not None:
+                rfm9x.frequency_mhz = frequency
+            if tx_power is not None:
+                rfm9x.tx_power = tx_power
+        finally:
+            # Always go back to receiving, even if a register write failed
+            rfm9x.listen()
+
+def reopen_gps(baudrate):
+    """Reopen the GPS UART at a new baud rate
+
+    The new port is opened before the old one is closed, so a failure leaves
+    the existing GPS connection running.
+    """
+    global gps
+
+    with gps_lock:
+        old_uart = gps_uart
+        gps = initialize_gps(baudrate)
+        if old_uart is not None:
             try:
-                rfm9x.deinit()
+                old_uart.close()
             except Exception as e:
-                print(f"Error deinitializing RFM9x: {e}")
-                
-        # Initialize RFM radio with a small delay to ensure stability
-        time.sleep(0.1)  
-        rfm9x = adafruit_rfm9x.RFM9x(spi, CS, RESET, frequency)
-        rfm9x.tx_power = tx_power
-        
-        # Give the module time to stabilize
-        time.sleep(0.1)
-        
-        return rfm9x
+                print(f"Error closing GPS UART: {e}")
+
+def initialize_lora(frequency, tx_power):
+    """Initialize or reinitialize LoRa radio with given settings"""
+    global rfm9x
+
+    # Callers are expected to hold lora_lock
+    # Configure RFM95 / LoRa radio
+    CS = digitalio.DigitalInOut(board.CE1)
+    RESET = digitalio.DigitalInOut(board.D25)
+
+    # Explicitly set the pins as outputs
+    CS.direction = digitalio.Direction.OUTPUT
+    RESET.direction = digitalio.Direction.OUTPUT
+
+    spi = busio.SPI(board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+
+    # Clean up old instance if it exists
+    if rfm9x is not None:
+        try:
+            rfm9x.deinit()
+        except Exception as e:
+            print(f"Error deinitializing RFM9x: {e}")
+
+    # Initialize RFM radio with a small delay to ensure stability
+    time.sleep(0.1)
+    rfm9x = adafruit_rfm9x.RFM9x(spi, CS, RESET, frequency)
+    rfm9x.tx_power = tx_power
+
+    # Give the module time to stabilize
+    time.sleep(0.1)
+
+    return rfm9x
 
 def parse_gps_packet(packet):
     """Parse GPS data from packet string"""
@@ -203,10 +406,358 @@ def parse_imu_packet(packet):
                 data['pressure'] = float(value)
             elif key == 'TEMP':
                 data['temp'] = float(value)
+
+        # Partial packets would wipe the xyz values in latest_data
+        if not (data['acc'] and data['mag'] and data['gyro']):
+            return None
         return data
     except:
         return None
 
+def open_checkpoint(path):
+    """Map the checkpoint file into memory, creating or resetting it if needed
+
+    The file is mapped shared, so every update lands in the page cache as
+    soon as it is written and survives the process crashing or being
+    restarted by systemd without any explicit flush.
+    """
+    global checkpoint_mm
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != CHECKPOINT_SIZE:
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, CHECKPOINT_SIZE)
+        mm = mmap.mmap(fd, CHECKPOINT_SIZE)
+    finally:
+        os.close(fd)
+
+    magic, version, length, _, _ = CHECKPOINT_HEADER.unpack_from(mm, 0)
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION or length != HISTORY_LENGTH:
+        # Unknown or stale layout, start from a blank checkpoint
+        mm[:] = bytes(CHECKPOINT_SIZE)
+        CHECKPOINT_HEADER.pack_into(mm, 0, CHECKPOINT_MAGIC, CHECKPOINT_VERSION,
+                                    HISTORY_LENGTH, 0, 0)
+
+    checkpoint_mm = mm
+    return mm
+
+def load_checkpoint():
+    """Restore latest_data, sample history and link counters from the checkpoint"""
+    global checkpoint_head, checkpoint_count
+
+    if checkpoint_mm is None:
+        return
+
+    _, _, _, head, count = CHECKPOINT_HEADER.unpack_from(checkpoint_mm, 0)
+    values = CHECKPOINT_STATE.unpack_from(checkpoint_mm, CHECKPOINT_STATE_OFFSET)
+
+    with data_lock:
+        (latest_data['gps']['lat'], latest_data['gps']['lng'], latest_data['gps']['alt'],
+         latest_data['imu']['acc']['x'], latest_data['imu']['acc']['y'], latest_data['imu']['acc']['z'],
+         latest_data['imu']['mag']['x'], latest_data['imu']['mag']['y'], latest_data['imu']['mag']['z'],
+         latest_data['imu']['gyro']['x'], latest_data['imu']['gyro']['y'], latest_data['imu']['gyro']['z'],
+         latest_data['imu']['pressure'], latest_data['imu']['temp'],
+         latest_data['receiver_gps']['lat'], latest_data['receiver_gps']['lng'],
+         latest_data['receiver_gps']['alt'],
+         latest_data['distance'], latest_data['timestamp'],
+         latest_data['link']['packets'], latest_data['link']['gps_packets'],
+         latest_data['link']['imu_packets'], latest_data['link']['parse_errors'],
+         latest_data['link']['rssi']) = values
+
+        # Oldest sample first so the deque ends up in arrival order
+        count = min(count, HISTORY_LENGTH)
+        sample_history.clear()
+        for i in range(count):
+            slot = (head - count + i) % HISTORY_LENGTH
+            sample_history.append(CHECKPOINT_SAMPLE.unpack_from(
+                checkpoint_mm, CHECKPOINT_HISTORY_OFFSET + slot * CHECKPOINT_SAMPLE.size))
+
+        checkpoint_head = head % HISTORY_LENGTH
+        checkpoint_count = count
+
+def checkpoint_state():
+    """Write latest_data into the checkpoint, caller must hold data_lock"""
+    if checkpoint_mm is None:
+        return
+
+    gps_data = latest_data['gps']
+    imu = latest_data['imu']
+    receiver_gps = latest_data['receiver_gps']
+    link = latest_data['link']
+    CHECKPOINT_STATE.pack_into(
+        checkpoint_mm, CHECKPOINT_STATE_OFFSET,
+        gps_data['lat'], gps_data['lng'], gps_data['alt'],
+        imu['acc']['x'], imu['acc']['y'], imu['acc']['z'],
+        imu['mag']['x'], imu['mag']['y'], imu['mag']['z'],
+        imu['gyro']['x'], imu['gyro']['y'], imu['gyro']['z'],
+        imu['pressure'], imu['temp'],
+        receiver_gps['lat'], receiver_gps['lng'], receiver_gps['alt'],
+        latest_data['distance'], latest_data['timestamp'],
+        link['packets'], link['gps_packets'], link['imu_packets'], link['parse_errors'],
+        link['rssi'])
+
+def checkpoint_sample(sample):
+    """Append a sample to the checkpoint history ring, caller must hold data_lock"""
+    global checkpoint_head, checkpoint_count
+
+    if checkpoint_mm is None:
+        return
+
+    CHECKPOINT_SAMPLE.pack_into(
+        checkpoint_mm, CHECKPOINT_HISTORY_OFFSET + checkpoint_head * CHECKPOINT_SAMPLE.size,
+        *sample)
+
+    # Publish the slot only after the record itself has been written
+    checkpoint_head = (checkpoint_head + 1) % HISTORY_LENGTH
+    checkpoint_count = min(checkpoint_count + 1, HISTORY_LENGTH)
+    CHECKPOINT_HEADER.pack_into(checkpoint_mm, 0, CHECKPOINT_MAGIC, CHECKPOINT_VERSION,
+                                HISTORY_LENGTH, checkpoint_head, checkpoint_count)
+
+def clear_history():
+    """Empty the sample history and its checkpoint ring, caller must hold data_lock"""
+    global checkpoint_head, checkpoint_count
+
+    sample_history.clear()
+    checkpoint_head = 0
+    checkpoint_count = 0
+    if checkpoint_mm is not None:
+        CHECKPOINT_HEADER.pack_into(checkpoint_mm, 0, CHECKPOINT_MAGIC, CHECKPOINT_VERSION,
+                                    HISTORY_LENGTH, 0, 0)
+
+def record_sample():
+    """Snapshot the rocket state into the sample history, caller must hold data_lock"""
+    gps_data = latest_data['gps']
+    imu = latest_data['imu']
+    sample = (latest_data['timestamp'],
+              gps_data['lat'], gps_data['lng'], gps_data['alt'],
+              imu['acc']['x'], imu['acc']['y'], imu['acc']['z'],
+              imu['mag']['x'], imu['mag']['y'], imu['mag']['z'],
+              imu['gyro']['x'], imu['gyro']['y'], imu['gyro']['z'],
+              imu['pressure'], imu['temp'])
+    sample_history.append(sample)
+    checkpoint_sample(sample)
+    checkpoint_state()
+    log_sample(sample)
+
+def open_flight_log(path):
+    """Open the flight log for appending, writing the CSV header to a new file"""
+    global flight_log
+
+    # Line buffered so exports always see complete samples
+    flight_log = open(path, 'a', buffering=1)
+    if flight_log.tell() == 0:
+        flight_log.write(','.join(SAMPLE_FIELDS) + '\n')
+    return flight_log
+
+def log_sample(sample):
+    """Append a sample to the flight log, caller must hold data_lock"""
+    if flight_log is None:
+        return
+
+    flight_log.write(','.join(repr(float(value)) for value in sample) + '\n')
+
+def start_new_flight():
+    """Archive the current flight log and start an empty one
+
+    The sample history and the rocket fields of latest_data are reset too,
+    so the dashboard trail and the checkpoint start fresh with the new log.
+    Returns the archived file name, or None if the current log was empty.
+    """
+    global flight_log
+
+    with data_lock:
+        if flight_log is not None:
+            flight_log.close()
+            flight_log = None
+
+        archived = None
+        if os.path.exists(FLIGHT_LOG_FILE):
+            with open(FLIGHT_LOG_FILE, 'r') as f:
+                next(f, None)  # Skip header
+                has_samples = next(f, None) is not None
+            if has_samples:
+                os.makedirs(FLIGHT_ARCHIVE_DIR, exist_ok=True)
+                archived = time.strftime('flight_%Y%m%d_%H%M%S.csv')
+                os.replace(FLIGHT_LOG_FILE, os.path.join(FLIGHT_ARCHIVE_DIR, archived))
+
+        open_flight_log(FLIGHT_LOG_FILE)
+
+        clear_history()
+        latest_data['gps'].update({'lat': 0, 'lng': 0, 'alt': 0})
+        latest_data['imu'].update({
+            'acc': {'x': 0, 'y': 0, 'z': 0},
+            'mag': {'x': 0, 'y': 0, 'z': 0},
+            'gyro': {'x': 0, 'y': 0, 'z': 0},
+            'pressure': 0,
+            'temp': 0
+        })
+        latest_data['distance'] = 0
+        latest_data['timestamp'] = 0
+        checkpoint_state()
+        return archived
+
+def list_flights():
+    """Return the file names of archived flights, oldest first"""
+    if not os.path.isdir(FLIGHT_ARCHIVE_DIR):
+        return []
+    return sorted(name for name in os.listdir(FLIGHT_ARCHIVE_DIR) if name.endswith('.csv'))
+
+def read_flight_log(path, start=None, end=None):
+    """Yield samples from a flight log one at a time
+
+    Samples outside the [start, end] time window are skipped. The file is
+    read line by line so memory use does not depend on the length of the
+    flight.
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r') as f:
+        next(f, None)  # Skip header
+        for line in f:
+            try:
+                sample = tuple(float(value) for value in line.split(','))
+            except ValueError:
+                continue
+            # A partially written last line has fewer fields
+            if len(sample) != len(SAMPLE_FIELDS):
+                continue
+
+            timestamp = sample[0]
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp > end:
+                continue
+
+            yield sample
+
+def decimate(samples, every):
+    """Yield every Nth sample"""
+    for index, sample in enumerate(samples):
+        if index % every == 0:
+            yield sample
+
+def has_fix(sample):
+    """Return True if a sample carries a rocket GPS position"""
+    return sample[1] != 0 or sample[2] != 0
+
+def track_points(samples):
+    """Yield only the samples that add a new rocket position to the track
+
+    IMU samples carry over the last GPS fix, so consecutive samples often
+    repeat the same position. Those repeats are skipped.
+    """
+    last_position = None
+    for sample in samples:
+        if not has_fix(sample):
+            continue
+        position = sample[1:4]
+        if position != last_position:
+            last_position = position
+            yield sample
+
+def chunked(pieces, size=EXPORT_CHUNK_SIZE):
+    """Join small strings into chunks of roughly the given size"""
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+def export_csv(samples):
+    """Generate a CSV document with one row per sample"""
+    yield ','.join(SAMPLE_FIELDS) + '\n'
+    for sample in samples:
+        yield ','.join(repr(value) for value in sample) + '\n'
+
+def export_geojson(samples):
+    """Generate a GeoJSON FeatureCollection with one Point per track sample"""
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for sample in samples:
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [sample[2], sample[1], sample[3]]},
+            'properties': dict(zip(SAMPLE_FIELDS, sample))
+        }
+        yield separator + json.dumps(feature, separators=(',', ':'))
+        separator = ','
+    yield ']}\n'
+
+def export_kml(samples):
+    """Generate a KML document with the flight path as a LineString"""
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+           '<name>Rocket flight</name><Placemark><name>Flight path</name>'
+           '<LineString><altitudeMode>absolute</altitudeMode><coordinates>\n')
+    for sample in samples:
+        yield f"{sample[2]!r},{sample[1]!r},{sample[3]!r}\n"
+    yield '</coordinates></LineString></Placemark></Document></kml>\n'
+
+# Export format name -> (generator, mimetype, file extension, track points only)
+EXPORT_FORMATS = {
+    'csv': (export_csv, 'text/csv', 'csv', False),
+    'geojson': (export_geojson, 'application/geo+json', 'geojson', True),
+    'kml': (export_kml, 'application/vnd.google-earth.kml+xml', 'kml', True)
+}
+
+def read_varint(packet, pos):
+    """Read an unsigned LEB128 varint, returning (value, next position)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = packet[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def parse_imu_batch(packet, received_at):
+    """Parse a batched IMU frame into a list of (timestamp, imu data) tuples
+
+    The frame carries the millis() at which it was built, so each sample is
+    back-dated from the arrival time by its age at transmission. Returns
+    None if the packet is not a well-formed batched IMU frame.
+    """
+    if len(packet) < 10 or packet[0] != IMU_BATCH_MAGIC:
+        return None
+
+    try:
+        count = packet[1]
+        ms, send_ms = struct.unpack_from('<II', packet, 2)
+        pos = 10
+        values = [0] * len(IMU_BATCH_SCALES)
+        samples = []
+        for _ in range(count):
+            dt, pos = read_varint(packet, pos)
+            ms = (ms + dt) & 0xFFFFFFFF
+            for i in range(len(values)):
+                raw, pos = read_varint(packet, pos)
+                # Undo zigzag encoding and apply the delta
+                values[i] += (raw >> 1) ^ -(raw & 1)
+
+            acc_x, acc_y, acc_z, mag_x, mag_y, mag_z, gyro_x, gyro_y, gyro_z, pressure, temp = (
+                value / scale for value, scale in zip(values, IMU_BATCH_SCALES))
+            timestamp = received_at - ((send_ms - ms) & 0xFFFFFFFF) / 1000.0
+            samples.append((timestamp, {
+                'acc': {'x': acc_x, 'y': acc_y, 'z': acc_z},
+                'mag': {'x': mag_x, 'y': mag_y, 'z': mag_z},
+                'gyro': {'x': gyro_x, 'y': gyro_y, 'z': gyro_z},
+                'pressure': pressure,
+                'temp': temp
+            }))
+        return samples
+    except IndexError:
+        return None
+
 def lora_receiver():
     """Background thread to receive LoRa packets"""
     global rfm9x
@@ -216,22 +767,48 @@ def lora_receiver():
             continue
         
         try:
-            packet = rfm9x.receive(timeout=1.0)
+            # Hold the lock so a retune never interleaves with an SPI transfer
+            with lora_lock:
+                packet = rfm9x.receive(timeout=LORA_RECEIVE_TIMEOUT)
             if packet:
+                rssi = rfm9x.last_rssi
+                received_at = time.time()
                 try:
-                    # Try to parse as GPS data first
-                    gps_data = parse_gps_packet(packet)
-                    if gps_data:
-                        with data_lock:
+                    gps_data = None
+                    imu_data = None
+                    batch = parse_imu_batch(packet, received_at)
+                    if batch is None:
+                        # Try to parse as GPS data first
+                        gps_data = parse_gps_packet(packet)
+                        imu_data = None if gps_data else parse_imu_packet(packet)
+                    with data_lock:
+                        if batch is not None:
+                            for timestamp, sample_imu in batch:
+                                latest_data['imu'].update(sample_imu)
+                                latest_data['timestamp'] = timestamp
+                                record_sample()
+                            counter = 'imu_packets'
+                        elif gps_data:
                             latest_data['gps'].update(gps_data)
-                            latest_data['timestamp'] = time.time()
-                    else:
-                        # Try to parse as IMU data
-                        imu_data = parse_imu_packet(packet)
-                        if imu_data:
-                            with data_lock:
-                                latest_data['imu'].update(imu_data)
-                                latest_data['timestamp'] = time.time()
+                            latest_data['timestamp'] = received_at
+                            record_sample()
+                            counter = 'gps_packets'
+                        elif imu_data:
+                            # Try to parse as IMU data
+                            latest_data['imu'].update(imu_data)
+                            latest_data['timestamp'] = received_at
+                            record_sample()
+                            counter = 'imu_packets'
+                        else:
+                            counter = 'parse_errors'
+
+                        # Count the packet only once its samples are recorded,
+                        # then checkpoint the updated counters
+                        link = latest_data['link']
+                        link['packets'] += 1
+                        link[counter] += 1
+                        link['rssi'] = rssi
+                        checkpoint_state()
                 except Exception as e:
                     print(f"Error parsing packet: {e}")
         except Exception as e:
@@ -243,49 +820,38 @@ def index():
     """Serve the main page"""
     return render_template('index.html')
 
+def render_settings(settings, **kwargs):
+    """Render the settings page for the given settings"""
+    return render_template('settings.html',
+                         current_frequency=settings['frequency'],
+                         current_tx_power=settings['tx_power'],
+                         current_gps_baudrate=settings['gps_baudrate'],
+                         frequency_range=FREQUENCY_RANGE,
+                         tx_power_range=TX_POWER_RANGE,
+                         gps_baudrates=GPS_BAUDRATES,
+                         **kwargs)
+
 @app.route('/settings', methods=['GET', 'POST'])
 def settings():
     """Handle settings page"""
     if request.method == 'POST':
         try:
             # Extract settings from form
-            frequency = float(request.form.get('lora_frequency', 433.0))
-            tx_power = int(request.form.get('lora_power', 20))
-            gps_baudrate = int(request.form.get('gps_baudrate', 9600))
-            
-            # Update settings
+            current = get_settings()
             new_settings = {
-                'frequency': frequency,
-                'tx_power': tx_power,
-                'gps_baudrate': gps_baudrate
+                'frequency': float(request.form.get('frequency', current['frequency'])),
+                'tx_power': int(request.form.get('tx_power', current['tx_power'])),
+                'gps_baudrate': int(request.form.get('gps_baudrate', current['gps_baudrate']))
             }
-            save_settings(new_settings)
-            
-            # Update LoRa settings
-            initialize_lora(frequency, tx_power)
-            
-            # Load updated settings
-            settings = load_settings()
-            return render_template('settings.html', 
-                                current_frequency=settings['frequency'],
-                                current_tx_power=settings['tx_power'],
-                                current_gps_baudrate=settings['gps_baudrate'],
-                                status='Settings updated successfully')
+
+            # Persist and apply only what changed
+            settings = update_settings(new_settings)
+            return render_settings(settings, status='Settings updated successfully')
         except Exception as e:
-            settings = load_settings()
-            return render_template('settings.html', 
-                                current_frequency=settings['frequency'],
-                                current_tx_power=settings['tx_power'],
-                                current_gps_baudrate=settings['gps_baudrate'],
-                                status=f"Error: {str(e)}", 
-                                error=True)
-    
+            return render_settings(get_settings(), status=f"Error: {str(e)}", error=True)
+
     # GET request
-    settings = load_settings()
-    return render_template('settings.html', 
-                         current_frequency=settings['frequency'],
-                         current_tx_power=settings['tx_power'],
-                         current_gps_baudrate=settings['gps_baudrate'])
+    return render_settings(get_settings())
 
 @app.route('/data')
 def get_data():
@@ -293,12 +859,92 @@ def get_data():
     with data_lock:
         return jsonify(latest_data)
 
+@app.route('/history')
+def get_history():
+    """API endpoint to get the rocket track from the recent-sample history
+
+    Returns one [lat, lng, alt, timestamp] entry per distinct GPS fix so the
+    dashboard can redraw the trail after a page load or a receiver restart.
+    """
+    with data_lock:
+        samples = list(sample_history)
+    path = [[sample[1], sample[2], sample[3], sample[0]] for sample in track_points(samples)]
+    return jsonify({'path': path})
+
+@app.route('/flights')
+def get_flights():
+    """API endpoint to list archived flights"""
+    return jsonify({'flights': list_flights()})
+
+@app.route('/flights/new', methods=['POST'])
+def new_flight():
+    """Archive the current flight log and start recording a new flight"""
+    try:
+        archived = start_new_flight()
+        if archived:
+            status = f"New flight started, previous flight saved as {archived}"
+        else:
+            status = 'New flight started'
+        return render_settings(get_settings(), status=status)
+    except Exception as e:
+        return render_settings(get_settings(), status=f"Error: {str(e)}", error=True)
+
+@app.route('/export/<fmt>')
+def export_flight(fmt):
+    """Stream the current or an archived flight as CSV, GeoJSON or KML
+
+    Optional query parameters: flight selects an archived flight from
+    /flights, start and end (Unix timestamps) limit the time window,
+    every=N keeps only every Nth sample (every Nth track point for
+    GeoJSON and KML).
+    """
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown export format: {fmt}"}), 404
+
+    flight = request.args.get('flight')
+    if flight is None:
+        path = FLIGHT_LOG_FILE
+        filename = 'flight'
+    elif flight in list_flights():
+        path = os.path.join(FLIGHT_ARCHIVE_DIR, flight)
+        filename = os.path.splitext(flight)[0]
+    else:
+        return jsonify({'error': f"Unknown flight: {flight}"}), 404
+
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    every = request.args.get('every', 1, type=int)
+    if every < 1:
+        return jsonify({'error': 'every must be at least 1'}), 400
+
+    generator, mimetype, extension, track_only = EXPORT_FORMATS[fmt]
+    samples = read_flight_log(path, start, end)
+    if track_only:
+        samples = track_points(samples)
+    samples = decimate(samples, every)
+    return Response(stream_with_context(chunked(generator(samples))),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}.{extension}'})
+
 if __name__ == '__main__':
+    # Restore state from the last run before any thread can touch it
+    try:
+        open_checkpoint(CHECKPOINT_FILE)
+        load_checkpoint()
+    except Exception as e:
+        print(f"Error loading checkpoint: {e}")
+
+    try:
+        open_flight_log(FLIGHT_LOG_FILE)
+    except Exception as e:
+        print(f"Error opening flight log: {e}")
+
     # Load initial settings
-    initial_settings = load_settings()
+    initial_settings = get_settings()
     
     # Initialize hardware
-    initialize_lora(initial_settings['frequency'], initial_settings['tx_power'])
+    with lora_lock:
+        initialize_lora(initial_settings['frequency'], initial_settings['tx_power'])
     gps = initialize_gps(initial_settings['gps_baudrate'])
     
     # Start LoRa receiver thread